@@ -2,39 +2,74 @@ import os
 import sys
 import asyncio
 from datetime import datetime, timezone
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PWTimeout
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
+
+from search_scraper import (
+    ACTION_TIMEOUT,
+    NAVIGATION_TIMEOUT,
+    USER_AGENT,
+    VIEWPORT,
+    BrowserManager,
+    EbaySearchScraper,
+    TelegramThrottle,
+    esc,
+    take_screenshot,
+)
+
+PRODUCT_JS = """
+() => {
+    return {
+        title: document.querySelector('h1 span')?.innerText?.trim() ||
+               document.querySelector('[itemprop="name"]')?.innerText?.trim() || 'N/A',
+        
+        price: document.querySelector('.vi-VR-cvipPrice')?.innerText?.trim() ||
+               document.querySelector('[itemprop="price"]')?.innerText?.trim() ||
+               document.querySelector('[class*="price"]')?.innerText?.trim() || 'N/A',
+        
+        condition: document.querySelector('.SECONDARY_INFO')?.innerText?.trim() ||
+                  document.querySelector('[class*="condition"]')?.innerText?.trim() || 'Used',
+        
+        ship: document.querySelector('[class*="shipping"]')?.innerText?.trim() || 'Check seller',
+        
+        seller: document.querySelector('.mbg')?.innerText?.trim() ||
+               document.querySelector('[class*="seller"]')?.innerText?.trim() || 'Unknown'
+    };
+}
+"""
 
 class EbayProductScraper:
+    _esc = staticmethod(esc)  # shared MarkdownV2 escaping
+    
     def __init__(self, token):
         self.bot = Bot(token=token)
     
-    @staticmethod
-    def _esc(text: str) -> str:
-        """Escape special characters for MarkdownV2"""
-        text = text.replace("\\", "\\\\")
-        for ch in r"_[]()*~`>#+=|{}.!-":
-            text = text.replace(ch, "\\" + ch)
-        return text
-    
-    async def edit_message(self, chat_id, message_id, text, buttons=None):
-        """Edit existing message"""
+    async def edit_message(self, chat_id, message_id, text, buttons=None, final=True):
+        """Edit existing message; non-final progress edits are rate limited"""
+        if not final and not TelegramThrottle.allow_progress(chat_id):
+            return
+        
+        markup = InlineKeyboardMarkup(buttons) if buttons else None
         try:
-            await self.bot.edit_message_text(
+            await TelegramThrottle.call(chat_id, lambda: self.bot.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
                 text=text,
                 parse_mode="MarkdownV2",
-                reply_markup=InlineKeyboardMarkup(buttons) if buttons else None
-            )
+                reply_markup=markup
+            ), final=final)
+        except RetryAfter as e:
+            # Still flooded after the retry; a new message would only make it worse
+            print(f"Edit failed: {e}")
         except Exception as e:
             print(f"Edit failed: {e}")
-            await self.bot.send_message(
+            await TelegramThrottle.call(chat_id, lambda: self.bot.send_message(
                 chat_id=chat_id,
                 text=text,
                 parse_mode="MarkdownV2",
-                reply_markup=InlineKeyboardMarkup(buttons) if buttons else None
-            )
+                reply_markup=markup
+            ))
     
     async def scrape_product(self, product_input, chat_id, edit_message_id=None):
         """Scrape eBay product - can be item ID or search term"""
@@ -42,256 +77,122 @@ class EbayProductScraper:
         if edit_message_id and edit_message_id != "undefined":
             await self.edit_message(
                 chat_id, int(edit_message_id),
-                "⏳ *Loading eBay product…*"
+                "⏳ *Loading eBay product…*", final=False
             )
         else:
-            msg = await self.bot.send_message(
+            msg = await TelegramThrottle.call(chat_id, lambda: self.bot.send_message(
                 chat_id=chat_id,
                 text="⏳ *Searching eBay…*",
                 parse_mode="MarkdownV2"
-            )
+            ))
         
         # Check if input is numeric (item ID) or text (search term)
         is_item_id = product_input.isdigit() and len(product_input) >= 9
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-dev-shm-usage"]
-            )
-            
-            context = await browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/123.0.0.0 Safari/537.36"
-                ),
-                viewport={"width": 1280, "height": 720}
-            )
-            
+        if not is_item_id:
+            # Search terms go through the shared search scraper
+            msg_id = msg.message_id if msg else int(edit_message_id)
+            searcher = EbaySearchScraper(self.bot.token)
+            try:
+                await searcher.scrape(product_input, chat_id, msg_id)
+            finally:
+                await searcher.close()
+            return
+        
+        browser = await BrowserManager.get_browser()
+        context = await browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+        photo = None
+        try:
             page = await context.new_page()
+            page.set_default_timeout(ACTION_TIMEOUT)
+            page.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+            progress = []
             
-            if is_item_id:
-                # Direct product fetch
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), "⏳ *Loading product…* \\[1/3\\]")
-                
-                url = f"https://www.ebay.com/itm/{product_input}"
-                await page.goto(url, wait_until="domcontentloaded", timeout=90_000)
-                await asyncio.sleep(3)
+            # Direct product fetch; progress edits run alongside the page work
+            if edit_message_id and edit_message_id != "undefined":
+                progress.append(asyncio.create_task(self.edit_message(
+                    chat_id, int(edit_message_id), "⏳ *Loading product…* \\[1/3\\]", final=False
+                )))
+            
+            url = f"https://www.ebay.com/itm/{product_input}"
+            # Any page step can hit the short default timeouts, not just goto
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                try:
+                    await page.wait_for_selector("h1", state="attached", timeout=10_000)
+                except PWTimeout:
+                    print("[WARN] Product title not found, continuing anyway…")
                 
                 # Extract single product details
                 if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), "⏳ *Extracting product…* \\[2/3\\]")
+                    progress.append(asyncio.create_task(self.edit_message(
+                        chat_id, int(edit_message_id), "⏳ *Extracting product…* \\[2/3\\]", final=False
+                    )))
                 
-                product = await page.evaluate("""
-() => {
-    return {
-        title: document.querySelector('h1 span')?.innerText?.trim() ||
-               document.querySelector('[itemprop="name"]')?.innerText?.trim() || 'N/A',
-        
-        price: document.querySelector('.vi-VR-cvipPrice')?.innerText?.trim() ||
-               document.querySelector('[itemprop="price"]')?.innerText?.trim() ||
-               document.querySelector('[class*="price"]')?.innerText?.trim() || 'N/A',
-        
-        condition: document.querySelector('.SECONDARY_INFO')?.innerText?.trim() ||
-                  document.querySelector('[class*="condition"]')?.innerText?.trim() || 'Used',
-        
-        ship: document.querySelector('[class*="shipping"]')?.innerText?.trim() || 'Check seller',
-        
-        seller: document.querySelector('.mbg')?.innerText?.trim() ||
-               document.querySelector('[class*="seller"]')?.innerText?.trim() || 'Unknown'
-    };
-}
-""")
+                extract = page.evaluate(PRODUCT_JS)
                 
-                print(f"[INFO] Extracted item: {product}")
-                
-                # Take screenshot
-                ss = await page.screenshot(
-                    clip={"x": 0, "y": 0, "width": 1280, "height": 720}
+                # Extract and screenshot in one go
+                product, ss = await asyncio.gather(
+                    extract,
+                    take_screenshot(page),
                 )
-                
-                await browser.close()
-                
-                # Send screenshot
-                await self.bot.send_photo(
-                    chat_id,
-                    photo=ss,
-                    caption=f"📸 *eBay Item* `{self._esc(product_input)}`",
-                    parse_mode="MarkdownV2"
+            except PWTimeout:
+                await asyncio.gather(*progress, return_exceptions=True)
+                await self.edit_message(
+                    chat_id, msg.message_id if msg else int(edit_message_id),
+                    "⌛ *eBay is responding slowly\\. Please try again shortly\\.*"
                 )
-                
-                # Format single product message
-                text = f"🛍 *eBay Product*\n\n"
-                text += f"*{self._esc(product['title'][:100])}*\n\n"
-                text += f"💰 ||{self._esc(product['price'])}||\n"
-                text += f"📦 {self._esc(product['condition'])}\n"
-                text += f"🚚 {self._esc(product['ship'])}\n"
-                text += f"🏪 {self._esc(product['seller'])}\n\n"
-                text += f"🆔 `{self._esc(product_input)}`\n\n"
-                
-                utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-                text += f"⏱ _Last updated:_ `{utc}`"
-                
-                buttons = [[
-                    InlineKeyboardButton("🔗 View on eBay", url=url),
-                    InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh:{product_input}")
-                ]]
-                
-                # Edit or send message
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), text, buttons=buttons)
-                elif msg:
-                    await self.edit_message(chat_id, msg.message_id, text, buttons=buttons)
-                else:
-                    await self.bot.send_message(
-                        chat_id=chat_id,
-                        text=text,
-                        parse_mode="MarkdownV2",
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
+                return
+            
+            print(f"[INFO] Extracted item: {product}")
+            
+            # Send screenshot while the report is built
+            photo = asyncio.create_task(TelegramThrottle.call(chat_id, lambda: self.bot.send_photo(
+                chat_id,
+                photo=ss,
+                caption=f"📸 *eBay Item* `{self._esc(product_input)}`",
+                parse_mode="MarkdownV2"
+            )))
+            
+            # Format single product message
+            text = f"🛍 *eBay Product*\n\n"
+            text += f"*{self._esc(product['title'][:100])}*\n\n"
+            text += f"💰 ||{self._esc(product['price'])}||\n"
+            text += f"📦 {self._esc(product['condition'])}\n"
+            text += f"🚚 {self._esc(product['ship'])}\n"
+            text += f"🏪 {self._esc(product['seller'])}\n\n"
+            text += f"🆔 `{self._esc(product_input)}`\n\n"
+            
+            utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+            text += f"⏱ _Last updated:_ `{utc}`"
+            
+            buttons = [[
+                InlineKeyboardButton("🔗 View on eBay", url=url),
+                InlineKeyboardButton("🔄 Refresh", callback_data=f"refresh:{product_input}")
+            ]]
+            
+            # Don't let a late progress edit overwrite the result
+            await asyncio.gather(*progress, return_exceptions=True)
+            
+            # Edit or send message
+            if edit_message_id and edit_message_id != "undefined":
+                await self.edit_message(chat_id, int(edit_message_id), text, buttons=buttons)
+            elif msg:
+                await self.edit_message(chat_id, msg.message_id, text, buttons=buttons)
             else:
-                # Search mode
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), "⏳ *Loading eBay…* \\[1/4\\]")
-                
-                url = f"https://www.ebay.com/sch/i.html?_nkw={product_input.replace(' ', '+')}&_sop=12"
-                await page.goto(url, wait_until="domcontentloaded", timeout=90_000)
-                await asyncio.sleep(5)
-                
-                # Scroll to render lazy-loaded items
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), "⏳ *Rendering products…* \\[2/4\\]")
-                
-                for _ in range(6):
-                    await page.evaluate("window.scrollBy(0, 1200)")
-                    await asyncio.sleep(1.2)
-                
-                # JS extraction with robust selectors
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), "⏳ *Extracting products…* \\[3/4\\]")
-                
-                try:
-                    await page.wait_for_selector("ul.srp-results, div.s-item__wrapper", timeout=15_000)
-                except Exception:
-                    print("[WARN] Product container not found, continuing anyway…")
-                
-                products = await page.evaluate("""
-() => {
-    const items = [];
-    const seen = new Set();
-    
-    document.querySelectorAll('a[href*="/itm/"]').forEach(a => {
-        const href = a.getAttribute('href') || '';
-        const id = href.split('/').pop().split('?')[0];
-        if (!id || seen.has(id)) return;
-        
-        let root = a.closest('li') || a.closest('div[role="option"]') || 
-                   a.closest('div[class*="item"]') || a.closest('article') || 
-                   a.closest('div');
-        if (!root) return;
-        
-        let title = '';
-        [
-            root.querySelector('h3'),
-            root.querySelector('[class*="title"]'),
-            root.querySelector('span[role="heading"]'),
-            a
-        ].forEach(el => {
-            if (!title && el) title = el.innerText || el.textContent || '';
-        });
-        
-        title = title.trim();
-        if (!title || title.toLowerCase().includes('shop on ebay') || title.length < 3) return;
-        
-        let price = '';
-        [
-            root.querySelector('[class*="price"]'),
-            root.querySelector('span[class*="BOLD"]'),
-            root.querySelector('[data-test-component="LISTING_PRICE"]')
-        ].forEach(el => {
-            if (!price && el) price = el.innerText || el.textContent || '';
-        });
-        
-        price = price.trim();
-        if (!price) return;
-        
-        let ship = '';
-        const shippingEl = root.querySelector('[class*="shipping"]') || 
-                          root.querySelector('[class*="SHIPPING"]');
-        if (shippingEl) ship = shippingEl.innerText || shippingEl.textContent || '';
-        
-        items.push({
-            id: id,
-            title: title.substring(0, 100),
-            price: price.substring(0, 50),
-            ship: ship.trim().substring(0, 50)
-        });
-        seen.add(id);
-    });
-    
-    return items;
-}
-""")
-                
-                print(f"[INFO] JS extracted: {len(products)} items")
-                
-                # Take screenshot
-                ss = await page.screenshot(
-                    clip={"x": 0, "y": 0, "width": 1280, "height": 720}
-                )
-                
-                await browser.close()
-                
-                # Send screenshot
-                await self.bot.send_photo(
-                    chat_id,
-                    photo=ss,
-                    caption=f"📸 *eBay results for* `{self._esc(product_input)}`",
-                    parse_mode="MarkdownV2"
-                )
-                
-                if not products:
-                    await self.bot.send_message(
-                        chat_id,
-                        "Rendered visually but JS extraction returned empty",
-                        parse_mode=None,
-                    )
-                    return
-                
-                # Text report + buttons
-                text = f"🔍 *eBay search:* `{self._esc(product_input)}`\n\n"
-                buttons = []
-                
-                for i, p in enumerate(products[:10], 1):
-                    text += (
-                        f"{i}\\. **{self._esc(p['title'][:80])}**\n"
-                        f"   💰 ||{self._esc(p['price'])}||"
-                    )
-                    if p["ship"]:
-                        text += f" 🚚 *{self._esc(p['ship'])}*"
-                    text += "\n\n"
-                    
-                    buttons.append(
-                        [InlineKeyboardButton(f"📦 View {i}", url=f"https://www.ebay.com/itm/{p['id']}")]
-                    )
-                
-                utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-                text += f"⏱ _Last updated:_ `{utc}`"
-                
-                # Edit or send message
-                if edit_message_id and edit_message_id != "undefined":
-                    await self.edit_message(chat_id, int(edit_message_id), text, buttons=buttons)
-                elif msg:
-                    await self.edit_message(chat_id, msg.message_id, text, buttons=buttons)
-                else:
-                    await self.bot.send_message(
-                        chat_id=chat_id,
-                        text=text,
-                        parse_mode="MarkdownV2",
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
+                await TelegramThrottle.call(chat_id, lambda: self.bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode="MarkdownV2",
+                    reply_markup=InlineKeyboardMarkup(buttons)
+                ))
+            
+            await photo
+        finally:
+            # A failed final edit must not leave the photo upload orphaned
+            if photo is not None:
+                await asyncio.gather(photo, return_exceptions=True)
+            await context.close()
 
 async def main():
     if len(sys.argv) < 3:
@@ -303,7 +204,10 @@ async def main():
     edit_message_id = sys.argv[3] if len(sys.argv) > 3 else None
     
     scraper = EbayProductScraper(os.getenv("TELEGRAM_BOT_TOKEN"))
-    await scraper.scrape_product(product_input, chat_id, edit_message_id)
+    try:
+        await scraper.scrape_product(product_input, chat_id, edit_message_id)
+    finally:
+        await BrowserManager.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
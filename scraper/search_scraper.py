@@ -6,31 +6,453 @@ GitHub Actions safe
 
 import os
 import sys
+import signal
 import asyncio
+import time
+import json
+from io import BytesIO
 from datetime import datetime, timezone
-from typing import Optional
-
-from playwright.async_api import async_playwright
+from typing import Final, Optional
+from urllib.parse import urlencode, urlparse
+
+import httpx
+from PIL import Image
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Route,
+    async_playwright,
+)
+from playwright.async_api import TimeoutError as PWTimeout
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # the result cache is optional
+    aioredis = None
 
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 if not BOT_TOKEN:
     raise RuntimeError("TELEGRAM_BOT_TOKEN not set")
 
+SEARCH_URL = "https://www.ebay.com/sch/i.html?"
+ITEM_SELECTOR = 'a[href*="/itm/"]'
+TOP_K = 10  # results per report
+
+# Installed once per context as window.__extractEbayItems(k), so each
+# scrape only sends a one-line call over CDP
+EXTRACT_JS: Final[str] = """
+k => {
+  const results = [];
+  const seen = new Set();
+
+  for (const a of document.querySelectorAll('a[href*="/itm/"]')) {
+    if (results.length >= k) break;
+
+    const href = a.getAttribute('href') || '';
+    const id = href.split('/').pop().split('?')[0];
+    if (!id || seen.has(id)) continue;
+
+    const root = a.closest('li') || a.closest('div[role="option"]') ||
+                 a.closest('div[class*="item"]') || a.closest('article') ||
+                 a.closest('div');
+    if (!root) continue;
+
+    const firstText = els => {
+      for (const el of els) {
+        const text = el && (el.innerText || el.textContent || '').trim();
+        if (text) return text;
+      }
+      return '';
+    };
+
+    const title = firstText([
+      root.querySelector('h3'),
+      root.querySelector('[class*="title"]'),
+      root.querySelector('span[role="heading"]'),
+      a,
+    ]);
+    // Skip eBay's "Shop on eBay" placeholder and other junk tiles
+    if (title.length < 3 || title.toLowerCase().includes('shop on ebay')) continue;
+
+    const price = firstText([
+      root.querySelector('[class*="price"]'),
+      root.querySelector('span[class*="BOLD"]'),
+      root.querySelector('[data-test-component="LISTING_PRICE"]'),
+    ]);
+    if (!price) continue;
+
+    const ship = firstText([
+      root.querySelector('[class*="shipping"]'),
+      root.querySelector('[class*="SHIPPING"]'),
+    ]);
+
+    results.push({
+      id,
+      title: title.slice(0, 100),
+      price: price.slice(0, 50),
+      ship: ship.slice(0, 50),
+    });
+
+    seen.add(id);
+  }
+
+  return results;
+}
+"""
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123 Safari/537.36"
+)
+VIEWPORT = {"width": 1280, "height": 720}
+
+# Screenshots are off by default; taking one means page assets can't be blocked
+SEND_SCREENSHOT = os.getenv("EBAY_SCREENSHOT", "0") == "1"
+SCREENSHOT_CLIP = {"x": 0, "y": 0, **VIEWPORT}
+SCREENSHOT_SIZE = (640, 360)
+
+# Nothing we parse needs these
+BLOCK_RESOURCES = not SEND_SCREENSHOT
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+TRACKER_HOSTS = (
+    "doubleclick.net",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "scorecardresearch.com",
+    "adnxs.com",
+    "criteo.com",
+)
+
+# Fail fast rather than tie up a pooled page (milliseconds)
+ACTION_TIMEOUT = 5_000
+NAVIGATION_TIMEOUT = 15_000
+
+# Headless scraping needs none of these subsystems; fewer processes, less RSS
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--disable-ipc-flooding-protection",
+]
+
+# Number of tabs kept open in the shared context, i.e. max concurrent scrapes
+POOL_SIZE = max(1, int(os.getenv("EBAY_POOL_SIZE", "4")))  # 0 would deadlock acquire_page
+
+# Progress edits closer together than this are dropped (Telegram rate limits)
+MIN_EDIT_INTERVAL = 1.0
+# Longest Telegram flood-control wait (seconds) we sit out before one retry
+MAX_RETRY_AFTER = 30
+
+# Repeat searches within CACHE_TTL seconds are served from Redis, if configured
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL = 300
+
+
+# MarkdownV2 specials (backslash included), escaped in a single pass
+MD_ESCAPE = str.maketrans({ch: "\\" + ch for ch in "\\_[]()*~`>#+=|{}.!-"})
+
 
 def esc(text: str) -> str:
     if not text:
         return ""
-    text = text.replace("\\", "\\\\")
-    for ch in r"_[]()*~`>#+=|{}.!-":
-        text = text.replace(ch, "\\" + ch)
-    return text
+    return text.translate(MD_ESCAPE)
+
+
+def search_url(keyword: str) -> str:
+    # _sop=12: "Best Match" sort
+    return SEARCH_URL + urlencode({"_nkw": keyword, "_sop": 12})
+
+
+# Candidate item containers, tried in order like the chained closest() in JS
+ROOT_MATCHERS = (
+    lambda n: n.tag == "li",
+    lambda n: n.tag == "div" and n.attributes.get("role") == "option",
+    lambda n: n.tag == "div" and "item" in (n.attributes.get("class") or ""),
+    lambda n: n.tag == "article",
+    lambda n: n.tag == "div",
+)
+TITLE_SELECTORS = ("h3", '[class*="title"]', 'span[role="heading"]')
+PRICE_SELECTORS = (
+    '[class*="price"]',
+    'span[class*="BOLD"]',
+    '[data-test-component="LISTING_PRICE"]',
+)
+SHIP_SELECTORS = ('[class*="shipping"]', '[class*="SHIPPING"]')
+
+
+def _closest(node: LexborNode, match) -> Optional[LexborNode]:
+    while node is not None and not match(node):
+        node = node.parent
+    return node
+
+
+def _text(node: Optional[LexborNode]) -> str:
+    return " ".join(node.text(separator=" ").split()) if node is not None else ""
+
+
+def _first_text(root: LexborNode, selectors) -> str:
+    for sel in selectors:
+        # Like querySelector: first matching descendant, never root itself
+        node = next((n for n in root.css(sel) if n != root), None)
+        text = _text(node)
+        if text:
+            return text
+    return ""
+
+
+def parse_search_html(html: str, k: int = TOP_K) -> list:
+    """Same extraction as the in-page JS, for server-rendered HTML."""
+    results = []
+    seen = set()
+
+    for a in LexborHTMLParser(html).css(ITEM_SELECTOR):
+        if len(results) >= k:
+            break
+
+        href = a.attributes.get("href") or ""
+        item_id = href.split("/")[-1].split("?")[0]
+        if not item_id or item_id in seen:
+            continue
+
+        root = next(
+            (r for r in (_closest(a, m) for m in ROOT_MATCHERS) if r is not None),
+            None,
+        )
+        if root is None:
+            continue
+
+        title = _first_text(root, TITLE_SELECTORS) or _text(a)
+        # Skip eBay's "Shop on eBay" placeholder and other junk tiles
+        if len(title) < 3 or "shop on ebay" in title.lower():
+            continue
+
+        price = _first_text(root, PRICE_SELECTORS)
+        if not price:
+            continue
+
+        ship = _first_text(root, SHIP_SELECTORS)
+
+        results.append({
+            "id": item_id,
+            "title": title[:100],
+            "price": price[:50],
+            "ship": ship[:50],
+        })
+        seen.add(item_id)
+
+    return results
+
+
+def cache_key(keyword: str) -> str:
+    return "ebay:" + " ".join(keyword.lower().split())
+
+
+def is_tracker(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS)
+
+
+async def block_heavy_requests(route: Route):
+    req = route.request
+    # Never abort a document: that would fail the search page itself
+    if req.resource_type != "document" and (
+        is_tracker(req.url)
+        or (BLOCK_RESOURCES and req.resource_type in BLOCKED_RESOURCE_TYPES)
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def shrink_screenshot(data: bytes) -> bytes:
+    out = BytesIO()
+    with Image.open(BytesIO(data)) as img:
+        img.resize(SCREENSHOT_SIZE, Image.BILINEAR).save(
+            out, "JPEG", quality=55, optimize=True
+        )
+    return out.getvalue()
+
+
+async def take_screenshot(page: Page) -> bytes:
+    """Viewport as a small JPEG; the resize runs in a worker thread."""
+    raw = await page.screenshot(type="jpeg", quality=60, clip=SCREENSHOT_CLIP)
+    return await asyncio.to_thread(shrink_screenshot, raw)
+
+
+class BrowserManager:
+    """Process-wide Chromium instance and a pool of pages to scrape with."""
+
+    _pw: Optional[Playwright] = None
+    _browser: Optional[Browser] = None
+    _ctx: Optional[BrowserContext] = None
+    _pages: Optional["asyncio.Queue[Optional[Page]]"] = None
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def get_browser(cls) -> Browser:
+        async with cls._lock:
+            if cls._browser is None or not cls._browser.is_connected():
+                if cls._pw is None:
+                    cls._pw = await async_playwright().start()
+                cls._browser = await cls._pw.chromium.launch(
+                    headless=True,
+                    args=CHROMIUM_ARGS,
+                )
+                # The old context and its pages died with the old browser
+                cls._ctx = None
+            return cls._browser
+
+    @classmethod
+    async def _context(cls) -> BrowserContext:
+        browser = await cls.get_browser()
+        async with cls._lock:
+            if cls._ctx is None:
+                cls._ctx = await browser.new_context(
+                    viewport=VIEWPORT,
+                    user_agent=USER_AGENT,
+                )
+                await cls._ctx.route("**/*", block_heavy_requests)
+                await cls._ctx.add_init_script(
+                    f"window.__extractEbayItems = {EXTRACT_JS};"
+                )
+            return cls._ctx
+
+    @classmethod
+    async def _new_page(cls) -> Page:
+        page = await (await cls._context()).new_page()
+        page.set_default_timeout(ACTION_TIMEOUT)
+        page.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+        return page
+
+    @classmethod
+    def _is_live(cls, page: Optional[Page]) -> bool:
+        return (
+            page is not None
+            and not page.is_closed()
+            and page.context is cls._ctx
+            and cls._browser is not None
+            and cls._browser.is_connected()
+        )
+
+    @classmethod
+    async def _page_pool(cls) -> "asyncio.Queue[Optional[Page]]":
+        async with cls._lock:
+            if cls._pages is None:
+                # Empty slots; pages are opened on first use
+                cls._pages = asyncio.Queue()
+                for _ in range(POOL_SIZE):
+                    cls._pages.put_nowait(None)
+            return cls._pages
+
+    @classmethod
+    async def acquire_page(cls) -> Page:
+        """Wait for a free page; at most POOL_SIZE scrapes run at once."""
+        pool = await cls._page_pool()
+        page = await pool.get()
+        if not cls._is_live(page):
+            # Never opened, crashed, or left over from a relaunched browser
+            try:
+                page = await cls._new_page()
+            except BaseException:
+                pool.put_nowait(None)
+                raise
+        return page
+
+    @classmethod
+    async def release_page(cls, page: Page):
+        if cls._is_live(page):
+            try:
+                await page.goto("about:blank")
+            except Exception as e:
+                print(f"[WARN] Could not reset page: {e}")
+                page = None
+        else:
+            page = None
+        if cls._pages is not None:
+            cls._pages.put_nowait(page)
+
+    @classmethod
+    async def close(cls):
+        async with cls._lock:
+            cls._pages = None
+            if cls._ctx is not None:
+                if cls._browser is not None and cls._browser.is_connected():
+                    await cls._ctx.close()
+                cls._ctx = None
+            if cls._browser is not None:
+                await cls._browser.close()
+                cls._browser = None
+            if cls._pw is not None:
+                await cls._pw.stop()
+                cls._pw = None
+
+
+class TelegramThrottle:
+    """Process-wide Telegram pacing shared by every scraper."""
+
+    _last_call_ts = 0.0
+    _penalty_until: dict = {}  # chat_id -> monotonic time flood control ends
+
+    @classmethod
+    def allow_progress(cls, chat_id: int) -> bool:
+        """Whether a throwaway progress update may be sent right now."""
+        now = time.monotonic()
+        if now - cls._last_call_ts < MIN_EDIT_INTERVAL:
+            return False
+        return now >= cls._penalty_until.get(chat_id, 0.0)
+
+    @classmethod
+    async def call(cls, chat_id: int, call, final: bool = True):
+        """Await call(). On flood control, progress calls are dropped (None);
+        final ones wait as told and retry once."""
+        if final:
+            # Don't walk straight back into an active flood-control window
+            wait = cls._penalty_until.get(chat_id, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        cls._last_call_ts = time.monotonic()
+        try:
+            return await call()
+        except RetryAfter as e:
+            delay = min(e.retry_after, MAX_RETRY_AFTER)
+            cls._penalty_until[chat_id] = time.monotonic() + delay
+            if not final:
+                print("[WARN] Telegram flood control, dropping progress update")
+                return None
+            print(f"[WARN] Telegram flood control, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            cls._last_call_ts = time.monotonic()
+            return await call()
 
 
 class EbaySearchScraper:
     def __init__(self, token: str):
         self.bot = Bot(token)
+        self.cache = (
+            aioredis.from_url(REDIS_URL) if aioredis and REDIS_URL else None
+        )
+
+    async def close(self):
+        if self.cache is not None:
+            await self.cache.aclose()
+            self.cache = None
 
     async def send_or_edit(
         self,
@@ -38,148 +460,258 @@ class EbaySearchScraper:
         text: str,
         message_id: Optional[int] = None,
         buttons=None,
+        final: bool = True,
     ):
+        if message_id and not final and not TelegramThrottle.allow_progress(chat_id):
+            return
+
         try:
             if message_id:
-                await self.bot.edit_message_text(
+                await TelegramThrottle.call(chat_id, lambda: self.bot.edit_message_text(
                     chat_id=chat_id,
                     message_id=message_id,
                     text=text,
                     parse_mode="MarkdownV2",
                     reply_markup=InlineKeyboardMarkup(buttons) if buttons else None,
-                )
+                ), final=final)
             else:
-                msg = await self.bot.send_message(
+                msg = await TelegramThrottle.call(chat_id, lambda: self.bot.send_message(
                     chat_id=chat_id,
                     text=text,
                     parse_mode="MarkdownV2",
-                )
+                ))
                 return msg.message_id
         except Exception as e:
             print(f"[WARN] Telegram error: {e}")
 
-    async def scrape(self, keyword: str, chat_id: int, edit_message_id: Optional[int]):
-        msg_id = edit_message_id or await self.send_or_edit(
-            chat_id, "⏳ *Starting eBay search…*"
-        )
-
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-dev-shm-usage"],
-            )
-
-            ctx = await browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/123 Safari/537.36"
-                ),
-            )
-
-            page = await ctx.new_page()
-
-            await self.send_or_edit(chat_id, "⏳ *Loading eBay…*", msg_id)
+    async def fetch_html_results(self, keyword: str) -> Optional[list]:
+        """Plain HTTP fetch; None means eBay wants a real browser."""
+        url = search_url(keyword)
+        try:
+            async with httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept-Language": "en-US,en;q=0.9",
+                },
+            ) as client:
+                r = await client.get(url, timeout=10)
+        except httpx.HTTPError as e:
+            print(f"[WARN] HTTP fetch failed: {e}")
+            return None
+
+        if r.status_code != 200:
+            print(f"[WARN] HTTP fetch got {r.status_code}, falling back to browser")
+            return None
+
+        products = await asyncio.to_thread(parse_search_html, r.text)
+        if not products:
+            print("[WARN] No items in HTML (captcha?), falling back to browser")
+            return None
+        return products
+
+    async def fetch_results(self, keyword: str, chat_id: int, msg_id: Optional[int]):
+        """Load the search page in Chromium and return (products, screenshot or None)."""
+        page = await BrowserManager.acquire_page()
+        progress = []
+        try:
+            # Progress edits must not hold up the page work
+            progress.append(asyncio.create_task(
+                self.send_or_edit(
+                    chat_id, "⏳ *Loading eBay…*", msg_id, final=False
+                )
+            ))
 
-            url = f"https://www.ebay.com/sch/i.html?_nkw={keyword.replace(' ', '+')}&_sop=12"
-            await page.goto(url, wait_until="domcontentloaded", timeout=90_000)
-            await asyncio.sleep(4)
+            url = search_url(keyword)
+            await page.goto(url, wait_until="commit")
+            try:
+                await page.wait_for_selector(
+                    ITEM_SELECTOR, state="attached", timeout=10_000
+                )
+            except PWTimeout:
+                print("[WARN] No item links after load, continuing anyway…")
 
+            # Results are server-rendered; scroll only if there are too few,
+            # and only while it keeps lazy-loading new items
             for _ in range(6):
+                count = await page.locator(ITEM_SELECTOR).count()
+                if count >= TOP_K:
+                    break
                 await page.evaluate("window.scrollBy(0, 1500)")
-                await asyncio.sleep(1)
-
-            products = await page.evaluate("""
-() => {
-  const results = [];
-  const seen = new Set();
-
-  document.querySelectorAll('a[href*="/itm/"]').forEach(a => {
-    const href = a.getAttribute('href') || '';
-    const id = href.split('/').pop().split('?')[0];
-    if (!id || seen.has(id)) return;
-
-    const root = a.closest('li') || a.closest('div');
-    if (!root) return;
-
-    const title = root.querySelector('h3')?.innerText || a.innerText;
-    const price = root.querySelector('[class*="price"]')?.innerText;
+                try:
+                    await page.wait_for_function(
+                        "([sel, n]) => document.querySelectorAll(sel).length > n",
+                        arg=[ITEM_SELECTOR, count],
+                        timeout=400,
+                    )
+                except PWTimeout:
+                    break
 
-    if (!title || !price) return;
+            extract = page.evaluate(
+                "k => window.__extractEbayItems(k)", TOP_K
+            )
+            if not SEND_SCREENSHOT:
+                return await extract, None
+            return await asyncio.gather(extract, take_screenshot(page))
+        finally:
+            # Don't let a late progress edit overwrite the result
+            await asyncio.gather(*progress, return_exceptions=True)
+            await BrowserManager.release_page(page)
+
+    async def cached_results(self, keyword: str):
+        if self.cache is None:
+            return None
+        key = cache_key(keyword)
+        try:
+            if SEND_SCREENSHOT:
+                raw, screenshot = await self.cache.mget(key, key + ":ss")
+            else:
+                raw, screenshot = await self.cache.get(key), None
+        except Exception as e:
+            print(f"[WARN] Cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw), screenshot
+
+    async def store_results(self, keyword: str, products, screenshot):
+        if self.cache is None or not products:
+            return
+        key = cache_key(keyword)
+        try:
+            async with self.cache.pipeline(transaction=False) as pipe:
+                pipe.set(key, json.dumps(products), ex=CACHE_TTL)
+                if screenshot:
+                    pipe.set(key + ":ss", screenshot, ex=CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            print(f"[WARN] Cache write failed: {e}")
+
+    @staticmethod
+    def _format_report(products: list, keyword: str):
+        """Pure MarkdownV2 report + buttons; safe to run in a worker thread."""
+        parts = [f"🔍 *eBay Search:* `{esc(keyword)}`\n\n"]
+        buttons = []
+
+        for i, p in enumerate(products[:TOP_K], 1):
+            parts.append(
+                f"{i}\\. **{esc(p['title'])}**\n"
+                f"   💰 `{esc(p['price'])}`"
+            )
+            if p["ship"]:
+                parts.append(f" 🚚 _{esc(p['ship'])}_")
+            parts.append("\n\n")
+
+            buttons.append([
+                InlineKeyboardButton(
+                    f"📦 View {i}",
+                    url=f"https://www.ebay.com/itm/{p['id']}"
+                )
+            ])
 
-    const ship = root.querySelector('[class*="shipping"]')?.innerText || '';
+        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        parts.append(f"⏱ _Updated:_ `{ts}`")
+        return "".join(parts), buttons
 
-    results.push({
-      id,
-      title: title.trim().slice(0, 100),
-      price: price.trim().slice(0, 50),
-      ship: ship.trim().slice(0, 50),
-    });
+    async def scrape(self, keyword: str, chat_id: int, edit_message_id: Optional[int]):
+        msg_id = edit_message_id or await self.send_or_edit(
+            chat_id, "⏳ *Starting eBay search…*"
+        )
 
-    seen.add(id);
-  });
+        cached = await self.cached_results(keyword)
+        if cached is not None:
+            products, screenshot = cached
+        else:
+            # Without a screenshot to take, try the cheap HTTP path first
+            products = await self.fetch_html_results(keyword) if not SEND_SCREENSHOT else None
+            if products:
+                screenshot = None
+            else:
+                try:
+                    products, screenshot = await self.fetch_results(
+                        keyword, chat_id, msg_id
+                    )
+                except PWTimeout as e:
+                    print(f"[WARN] eBay timed out: {e}")
+                    await self.send_or_edit(
+                        chat_id,
+                        "⌛ *eBay is responding slowly\\. Please try again shortly\\.*",
+                        msg_id,
+                    )
+                    return
+            await self.store_results(keyword, products, screenshot)
 
-  return results;
-}
-""")
+        if not products:
+            await self.send_or_edit(
+                chat_id,
+                "❌ *No products found. Try another keyword.*",
+                msg_id,
+            )
+            return
 
-            if not products:
-                await self.send_or_edit(
-                    chat_id,
-                    "❌ *No products found. Try another keyword.*",
-                    msg_id,
-                )
-                await browser.close()
-                return
+        text, buttons = await asyncio.to_thread(
+            self._format_report, products, keyword
+        )
 
-            screenshot = await page.screenshot()
-            await self.bot.send_photo(
+        sends = [self.send_or_edit(chat_id, text, msg_id, buttons)]
+        if screenshot:
+            sends.append(TelegramThrottle.call(chat_id, lambda: self.bot.send_photo(
                 chat_id,
                 screenshot,
                 caption=f"📸 *Results for* `{esc(keyword)}`",
                 parse_mode="MarkdownV2",
-            )
-
-            text = f"🔍 *eBay Search:* `{esc(keyword)}`\n\n"
-            buttons = []
-
-            for i, p in enumerate(products[:10], 1):
-                text += (
-                    f"{i}\\. **{esc(p['title'])}**\n"
-                    f"   💰 `{esc(p['price'])}`"
-                )
-                if p["ship"]:
-                    text += f" 🚚 _{esc(p['ship'])}_"
-                text += "\n\n"
-
-                buttons.append([
-                    InlineKeyboardButton(
-                        f"📦 View {i}",
-                        url=f"https://www.ebay.com/itm/{p['id']}"
-                    )
-                ])
-
-            ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-            text += f"⏱ _Updated:_ `{ts}`"
-
-            await self.send_or_edit(chat_id, text, msg_id, buttons)
-            await browser.close()
+            )))
+        await asyncio.gather(*sends)
+
+
+def parse_args(argv: list):
+    """Return [(keyword, chat_id, edit_message_id), ...] from the CLI."""
+    if len(argv) >= 3 and argv[1] == "--keywords":
+        keywords = [k.strip() for k in argv[2].split(",") if k.strip()]
+        chat_ids = [int(c) for c in argv[3].split(",")] if len(argv) >= 4 else []
+        if len(chat_ids) == 1:
+            chat_ids *= len(keywords)
+        if keywords and len(chat_ids) == len(keywords):
+            return [(kw, cid, None) for kw, cid in zip(keywords, chat_ids)]
+    elif len(argv) >= 3:
+        raw_edit = argv[3] if len(argv) >= 4 else None
+        edit_id = int(raw_edit) if raw_edit and raw_edit.isdigit() else None
+        return [(argv[1], int(argv[2]), edit_id)]
+
+    print(
+        "Usage: search_scraper.py <keyword> <chat_id> [edit_message_id]\n"
+        "       search_scraper.py --keywords <kw1,kw2,...> <chat_id>[,<chat_id>...]"
+    )
+    sys.exit(1)
 
 
 async def main():
-    if len(sys.argv) < 3:
-        print("Usage: search_scraper.py <keyword> <chat_id> [edit_message_id]")
-        sys.exit(1)
-
-    keyword = sys.argv[1]
-    chat_id = int(sys.argv[2])
+    jobs = parse_args(sys.argv)
 
-    raw_edit = sys.argv[3] if len(sys.argv) >= 4 else None
-    edit_id = int(raw_edit) if raw_edit and raw_edit.isdigit() else None
+    # Let SIGTERM (e.g. a job timeout) unwind through the finally below
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
 
     scraper = EbaySearchScraper(BOT_TOKEN)
-    await scraper.scrape(keyword, chat_id, edit_id)
+    try:
+        # One shared browser; each keyword gets its own pooled page
+        results = await asyncio.gather(
+            *[scraper.scrape(kw, cid, edit_id) for kw, cid, edit_id in jobs],
+            return_exceptions=True,
+        )
+        failed = False
+        for (kw, _, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"[ERROR] Search for {kw!r} failed: {result!r}")
+                failed = True
+        if failed:
+            # Keep the CI job red, as an uncaught error would
+            sys.exit(1)
+    finally:
+        await scraper.close()
+        await BrowserManager.close()
 
 
 if __name__ == "__main__":